@@ -1,42 +1,80 @@
 #!/usr/bin/python3
 
+import email.utils
 import os
 import re
 import sys
 import urllib.parse
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import xml.etree.ElementTree as ET
-import shutil
+
+import urllib3
+
+# Shared connection pool so all downloads reuse the same keep-alive
+# connections instead of paying a TCP+TLS handshake per file.
+_POOL = urllib3.PoolManager(maxsize=16, block=True)
+_WORKERS = 8
+
+_URL_PATTERNS = [
+    re.compile(r"^.*/playback/presentation/2\.0/playback.html\?meetingId=(\S+)$"),
+    re.compile(r"^.*/playback/presentation/2.3/(\S+)$"),
+]
+
+SVG_IMAGE = "{http://www.w3.org/2000/svg}image"
+XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+
+
+def _httpdate(timestamp):
+    return email.utils.formatdate(timestamp, usegmt=True)
 
 
 def fetch(url, target: Path):
-    if target.exists() and target.stat().st_size > 0:
-        print(f"Skipped: {url}")
-        return target
+    have = target.stat().st_size if target.exists() else 0
+    headers = {}
+    mode = "wb"
 
     try:
+        head = _POOL.request("HEAD", url)
+        remote_size = int(head.headers.get("Content-Length", -1))
+
+        if have and have == remote_size:
+            # Same length as the server copy: refetch only if it changed
+            # since we stored it.
+            headers["If-Modified-Since"] = _httpdate(target.stat().st_mtime)
+        elif 0 < have < remote_size:
+            # Partial file from an interrupted run: resume where we left off.
+            headers["Range"] = f"bytes={have}-"
+            mode = "ab"
+
         print(f"Downloading: {url}")
-        with urllib.request.urlopen(url) as rs:
-            os.makedirs(target.parent, exist_ok=True)
-            with open(target, "wb") as fp:
-                shutil.copyfileobj(rs, fp)
+        rs = _POOL.request("GET", url, headers=headers, preload_content=False)
+        if rs.status == 304:
+            rs.release_conn()
+            print(f"Unchanged: {url}")
+            return target
+        if rs.status >= 400:
+            rs.release_conn()
+            print(f"Failed: {url} ({rs.status})")
+            return
+        if mode == "ab" and rs.status != 206:
+            # Server ignored the Range request, start over.
+            mode = "wb"
+        os.makedirs(target.parent, exist_ok=True)
+        with open(target, mode) as fp:
+            for chunk in rs.stream(65536):
+                fp.write(chunk)
+        rs.release_conn()
         return target
-    except urllib.error.HTTPError as e:
+    except urllib3.exceptions.HTTPError as e:
         print(f"Failed: {url} ({e})")
         return
-    except KeyboardInterrupt:
-        if target.exists():
-            target.unlink()
-        raise
+    # Partial files are kept on KeyboardInterrupt: the next run resumes them.
 
 
 def getMeetingId(url):
-    for pattern in (
-        r"^.*/playback/presentation/2\.0/playback.html\?meetingId=(\S+)$",
-        r"^.*/playback/presentation/2.3/(\S+)$",
-    ):
-        m = re.match(pattern, url)
+    for pattern in _URL_PATTERNS:
+        m = pattern.match(url)
         if m:
             return m.group(1)
     raise ValueError(f"Unsupported presentation URL: {url}")
@@ -49,22 +87,30 @@ def download(url, outputPath: Path):
     def sfetch(name):
         return fetch(urllib.parse.urljoin(base, name), outputPath / name)
 
-    sfetch("metadata.xml")
+    # shapes.svg is needed up-front to enumerate the slide images.
     sfetch("shapes.svg")
 
+    names = [
+        "metadata.xml",
+        "panzooms.xml",
+        "cursor.xml",
+        "deskshare.xml",
+        "presentation_text.json",
+        "captions.json",
+        "slides_new.xml",
+        "video/webcams.webm",
+        "deskshare/deskshare.webm",
+    ]
+
     with open(outputPath / "shapes.svg", "rb") as fp:
         shapes = ET.parse(fp)
-        for img in shapes.iterfind(".//{http://www.w3.org/2000/svg}image"):
-            sfetch(img.get("{http://www.w3.org/1999/xlink}href"))
-
-    sfetch("panzooms.xml")
-    sfetch("cursor.xml")
-    sfetch("deskshare.xml")
-    sfetch("presentation_text.json")
-    sfetch("captions.json")
-    sfetch("slides_new.xml")
-    sfetch("video/webcams.webm")
-    sfetch("deskshare/deskshare.webm")
+        for img in shapes.iterfind(f".//{SVG_IMAGE}"):
+            names.append(img.get(XLINK_HREF))
+
+    tasks = [(urllib.parse.urljoin(base, name), outputPath / name) for name in names]
+    with ThreadPoolExecutor(max_workers=_WORKERS) as pool:
+        for _ in pool.map(lambda task: fetch(*task), tasks):
+            pass
 
 
 if __name__ == "__main__":
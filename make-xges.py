@@ -4,12 +4,18 @@ import logging
 
 logging.basicConfig(level=logging.DEBUG)
 
+from concurrent.futures import ProcessPoolExecutor
 from decimal import Decimal
 import argparse
+import functools
+import hashlib
+import itertools
+import math
 import os
+import queue
 import sys
+import threading
 import cairosvg
-from intervaltree import Interval, IntervalTree
 from collections import namedtuple
 
 import gi
@@ -20,12 +26,43 @@ gi.require_version("GES", "1.0")
 
 from gi.repository import GLib, GObject, Gst, GstPbutils, GES
 
+# Optional native SVG rasterizers. Both are much faster than cairosvg on
+# heavily annotated slides; cairosvg remains the fallback.
+try:
+    import resvg_py
+except ImportError:
+    resvg_py = None
+
+try:
+    gi.require_version("Rsvg", "2.0")
+    from gi.repository import Rsvg
+    import cairo
+except (ImportError, ValueError):
+    Rsvg = None
+
+# Optional JIT for the interval sweep on heavily annotated recordings.
+try:
+    import numba
+    import numpy as np
+except ImportError:
+    numba = None
+
 import xml.etree.ElementTree as ET
 
 ET.register_namespace("", "http://www.w3.org/2000/svg")
 ET.register_namespace("xlink", "http://www.w3.org/1999/xlink")
 
+# Namespace-qualified tags and queries, bound once so the hot loops in
+# _generate_slides don't re-intern the long literals per element.
+SVG = "{http://www.w3.org/2000/svg}"
+XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+SVG_IMAGE = SVG + "image"
+SVG_IMAGE_Q = f"./{SVG}image"
+SVG_G_CANVAS_Q = f'./{SVG}g[@class="canvas"]'
+SVG_G_SHAPE_Q = f'./{SVG}g[@class="shape"]'
+
 
+@functools.lru_cache(maxsize=None)
 def file_to_uri(path):
     path = os.path.realpath(path)
     return "file://" + path
@@ -35,14 +72,232 @@ def minmax(low, val, high):
     return max(low, min(val, high))
 
 
+_PREFETCH_END = object()
+
+
+def _prefetch(iterable, depth=8):
+    """Run `iterable` in a background thread, keeping up to `depth` items
+    ready ahead of the consumer. Exceptions are re-raised at the consumer
+    end."""
+    items = queue.Queue(maxsize=depth)
+
+    def producer():
+        try:
+            for item in iterable:
+                items.put(item)
+            items.put(_PREFETCH_END)
+        except BaseException as e:
+            items.put(e)
+
+    threading.Thread(target=producer, daemon=True).start()
+    while True:
+        item = items.get()
+        if item is _PREFETCH_END:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+def _build_slices(begin, end, intervals):
+    """Split overlapping (start, end, data) intervals into non-overlapping
+    time slices covering [begin, end), merging the data lists of all
+    intervals active in each slice.
+
+    Yields (slice_start, slice_end, data). A single sweep over the sorted
+    interval bounds; intervals outside [begin, end) are clamped or
+    dropped. Large interval counts are dispatched to a Numba-compiled
+    kernel when numba is installed."""
+    if numba is not None and len(intervals) >= 64:
+        yield from _build_slices_jit(begin, end, intervals)
+    else:
+        yield from _build_slices_py(begin, end, intervals)
+
+
+def _build_slices_py(begin, end, intervals):
+    events = []
+    for idx, (start, stop, data) in enumerate(intervals):
+        start = max(start, begin)
+        stop = min(stop, end)
+        if stop <= start:
+            continue
+        events.append((start, 1, idx))
+        events.append((stop, 0, idx))
+    events.sort(key=lambda e: e[:2])
+
+    active = set()
+    prev = begin
+    for ts, is_start, idx in events:
+        if ts > prev and active:
+            data = [item for i in active for item in intervals[i][2]]
+            yield prev, ts, data
+            prev = ts
+        elif not active:
+            prev = ts
+        if is_start:
+            active.add(idx)
+        else:
+            active.discard(idx)
+
+
+def _build_slices_jit(begin, end, intervals):
+    n = len(intervals)
+    starts = np.empty(n, np.int64)
+    ends = np.empty(n, np.int64)
+    for i, (start, stop, data) in enumerate(intervals):
+        starts[i] = max(start, begin)
+        ends[i] = min(stop, end)
+    keep = np.nonzero(starts < ends)[0]
+    ids = np.arange(len(keep), dtype=np.int64)
+
+    bounds = np.concatenate([starts[keep], ends[keep]])
+    kinds = np.concatenate(
+        [np.ones(len(keep), np.int64), np.zeros(len(keep), np.int64)]
+    )
+    ids = np.concatenate([ids, ids])
+    order = np.lexsort((kinds, bounds))
+
+    out_start, out_end, offsets, flat = _sweep_kernel(
+        begin, bounds[order], kinds[order], ids[order], len(keep)
+    )
+    for k in range(len(out_start)):
+        data = [
+            item
+            for j in flat[offsets[k] : offsets[k + 1]]
+            for item in intervals[keep[j]][2]
+        ]
+        yield int(out_start[k]), int(out_end[k]), data
+
+
+if numba is not None:
+
+    @numba.njit(cache=True)
+    def _sweep_kernel(begin, bounds, kinds, ids, n):
+        """Walk sorted interval events and emit the slice bounds plus the
+        ids of the intervals active in each slice (CSR layout)."""
+        m = bounds.shape[0]
+        active = np.zeros(n, np.uint8)
+
+        # First walk: count slices and total active entries.
+        nactive = 0
+        nslices = 0
+        total = 0
+        prev = begin
+        for i in range(m):
+            t = bounds[i]
+            if t > prev and nactive > 0:
+                nslices += 1
+                total += nactive
+                prev = t
+            elif nactive == 0:
+                prev = t
+            if kinds[i] == 1:
+                nactive += 1
+            else:
+                nactive -= 1
+
+        out_start = np.empty(nslices, np.int64)
+        out_end = np.empty(nslices, np.int64)
+        offsets = np.zeros(nslices + 1, np.int64)
+        flat = np.empty(total, np.int64)
+
+        # Second walk: fill.
+        nactive = 0
+        k = 0
+        pos = 0
+        prev = begin
+        for i in range(m):
+            t = bounds[i]
+            if t > prev and nactive > 0:
+                out_start[k] = prev
+                out_end[k] = t
+                for j in range(n):
+                    if active[j]:
+                        flat[pos] = j
+                        pos += 1
+                k += 1
+                offsets[k] = pos
+                prev = t
+            elif nactive == 0:
+                prev = t
+            if kinds[i] == 1:
+                active[ids[i]] = 1
+                nactive += 1
+            else:
+                active[ids[i]] = 0
+                nactive -= 1
+
+        return out_start, out_end, offsets, flat
+
+
+# Per-process render surfaces, reused across slides of the same size so
+# each worker allocates (and zeroes) the raster buffer only once.
+_SURFACES = {}
+
+
+def _rasterize(svg_bytes, path, size):
+    """Rasterize a serialized SVG to a PNG file of the given size.
+
+    Prefers resvg, then librsvg, then cairosvg."""
+    w, h = size
+
+    if resvg_py is not None:
+        png = resvg_py.svg_to_bytes(
+            svg_string=svg_bytes.decode("utf-8"), width=w, height=h
+        )
+        with open(path, "wb") as fp:
+            fp.write(bytes(png))
+        return
+
+    if Rsvg is not None:
+        surface = _SURFACES.get(size)
+        if surface is None:
+            surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, w, h)
+            _SURFACES[size] = surface
+        cr = cairo.Context(surface)
+        cr.save()
+        cr.set_operator(cairo.OPERATOR_CLEAR)
+        cr.paint()
+        cr.restore()
+        viewport = Rsvg.Rectangle()
+        viewport.x = viewport.y = 0
+        viewport.width, viewport.height = w, h
+        Rsvg.Handle.new_from_data(svg_bytes).render_document(cr, viewport)
+        surface.write_to_png(path)
+        return
+
+    cairosvg.svg2png(bytestring=svg_bytes, write_to=path)
+
+
+def _render_png_job(job):
+    """Rasterize one serialized SVG to a PNG file (process pool worker)."""
+    svg_bytes, path, size = job
+    _rasterize(svg_bytes, path, size)
+
+
 def to_ns(val, digits=3):
     """Converts seconds (int, float, str) to Gstreamer native timestamps
     (nanoseconds) while avoiding most floating-point rounding errors.
 
     Input values are natively rounded to 3 decimal places (milliseconds) by
-    default.
+    default. This is called for every timestamp attribute in shapes.svg, so
+    the common decimal-string case is handled with plain integer math.
     """
-    return int(round(Decimal(val), digits) * Gst.SECOND)
+    s = val if isinstance(val, str) else str(val)
+    try:
+        whole, _, frac = s.lstrip("+").partition(".")
+        neg = whole.startswith("-")
+        if neg:
+            whole = whole[1:]
+        scale = 10 ** digits
+        frac = (frac + "0" * (digits + 1))[: digits + 1]
+        ns = (int(whole or "0") * scale + (int(frac) + 5) // 10) * (
+            Gst.SECOND // scale
+        )
+        return -ns if neg else ns
+    except ValueError:
+        # Exotic representations (exponents etc.) take the slow path.
+        return int(round(Decimal(val), digits) * Gst.SECOND)
 
 
 class Presentation:
@@ -53,11 +308,22 @@ class Presentation:
 
     """
 
-    def __init__(self, source, size):
+    def __init__(self, source, size, codec="auto"):
         self._asset_cache = {}
         self._layer_cache = {}
+        self._path_cache = {}
+        self._size_cache = {}
+        self._duration_cache = {}
+        self._render_pool = None
+        self._render_futures = {}
+        self._render_cache = {}
+        # Interned so the per-clip GObject property lookups hash cheaply.
+        self._clip_props = tuple(
+            sys.intern(name) for name in ("posx", "posy", "width", "height")
+        )
 
-        self.asset_path = os.path.abspath(source)
+        # Resolve symlinks once; joins below then stay in the real tree.
+        self.asset_path = os.path.realpath(source)
         self.xml_meta = ET.parse(self._asset_path("metadata.xml"))
 
         self.name = self.xml_meta.find("./meta/meetingName").text.strip()
@@ -77,10 +343,16 @@ class Presentation:
             self.video_track, self.audio_track = self.audio_track, self.video_track
         self.project = self.timeline.get_asset()
 
-        self.set_track_caps(fps=24, hz=48000)
+        self.set_track_caps(fps=24, hz=48000, codec=codec)
         self.set_project_metadata("name", self.name)
         self.init_layers("Credits", "Camera", "Slides", "Deskshare", "Backdrop")
 
+        # Batch timeline bookkeeping: hold back commits while clips are
+        # added and do a single commit_sync in save() (GES >= 1.22; older
+        # versions just coalesce per-add commits as before).
+        if hasattr(self.timeline, "freeze_commit"):
+            self.timeline.freeze_commit()
+
     def cut(self, start, end=0):
         """Define which part of the presentation should be rendered.
 
@@ -93,8 +365,8 @@ class Presentation:
     def set_project_metadata(self, name, value):
         self.project.register_meta_string(GES.MetaFlag.READWRITE, name, value)
 
-    def set_track_caps(self, fps=24, hz=48000):
-        """ Set frame rate and audio sampling rate """
+    def set_track_caps(self, fps=24, hz=48000, codec="auto"):
+        """ Set frame rate, audio sampling rate, and video codec """
         self.video_track.props.restriction_caps = Gst.Caps.from_string(
             f"video/x-raw(ANY), width=(int){self.width}, height=(int){self.height}, "
             f"framerate=(fraction){fps}/1"
@@ -103,22 +375,48 @@ class Presentation:
             f"audio/x-raw(ANY), rate=(int){hz}, channels=(int)2"
         )
 
-        vp8_preset = Gst.ElementFactory.make("vp8enc", "vp8_preset")
-        vp8_preset.set_property("threads", 8)
-        vp8_preset.set_property("token-partitions", 2)
-        vp8_preset.set_property("target-bitrate", 2500000)
-        vp8_preset.set_property("deadline", 0)  # best
-        vp8_preset.set_property("end-usage", 2)  # Constant Quality Mode
-        vp8_preset.set_property("cq-level", 10)
-        Gst.Preset.save_preset(vp8_preset, "vp8_preset")
+        threads = max(1, os.cpu_count() or 8)
+
+        if codec == "auto":
+            # vp9enc grew row-mt in GStreamer 1.20; without it VP9 encodes
+            # mostly single-threaded within a frame.
+            codec = "vp9" if Gst.version()[:2] >= (1, 20) else "vp8"
+
+        if codec == "vp9":
+            preset_name = "vp9_preset"
+            preset = Gst.ElementFactory.make("vp9enc", preset_name)
+            preset.set_property("threads", threads)
+            preset.set_property("tile-columns", int(math.log2(max(1, threads // 2))))
+            preset.set_property("tile-rows", 0)
+            preset.set_property("frame-parallel-decoding", True)
+            preset.set_property("cpu-used", 6)  # remoting/screencast profile
+            preset.set_property("end-usage", 2)  # Constant Quality Mode
+            preset.set_property("cq-level", 28)
+            if preset.find_property("row-mt") is not None:
+                preset.set_property("row-mt", True)
+            video_caps = "video/x-vp9"
+        else:
+            preset_name = "vp8_preset"
+            preset = Gst.ElementFactory.make("vp8enc", preset_name)
+            preset.set_property("threads", threads)
+            # One token partition per thread (max 8) so threads can actually
+            # work within a frame instead of just pipelining across frames.
+            preset.set_property("token-partitions", int(math.log2(min(8, threads))))
+            preset.set_property("target-bitrate", 2500000)
+            preset.set_property("deadline", 0)  # best
+            preset.set_property("cpu-used", -6)  # Chrome's speed/quality default
+            preset.set_property("end-usage", 2)  # Constant Quality Mode
+            preset.set_property("cq-level", 10)
+            video_caps = "video/x-vp8"
+        Gst.Preset.save_preset(preset, preset_name)
 
         profile = GstPbutils.EncodingContainerProfile.new(
             "default", "bbb-render encoding profile", Gst.Caps.from_string("video/webm")
         )
         profile.add_profile(
             GstPbutils.EncodingVideoProfile.new(
-                Gst.Caps.from_string("video/x-vp8"),
-                "vp8_preset",
+                Gst.Caps.from_string(video_caps),
+                preset_name,
                 self.video_track.props.restriction_caps,
                 0,
             )
@@ -154,21 +452,26 @@ class Presentation:
         # dt = minmax(0, dt, asset_duration - skip)
 
         clip = layer.add_asset(asset, ts, skip, dt, GES.TrackType.UNKNOWN)
-        for element in clip.find_track_elements(
-            self.video_track, GES.TrackType.VIDEO, GObject.TYPE_NONE
-        ):
-            element.set_child_property("posx", pos[0])
-            element.set_child_property("posy", pos[1])
-            element.set_child_property("width", size[0])
-            element.set_child_property("height", size[1])
+        # get_children is a plain list walk; find_track_elements does an
+        # internal linear search with type checks per call.
+        for element in clip.get_children(False):
+            if element.get_track() != self.video_track:
+                continue
+            for prop, value in zip(self._clip_props, (*pos, *size)):
+                element.set_child_property(prop, value)
 
     def _get_layer(self, name):
         return self._layer_cache[name]
 
     def _asset_path(self, name):
-        if not os.path.isabs(name):
-            name = os.path.join(self.asset_path, name)
-        return os.path.realpath(name)
+        path = self._path_cache.get(name)
+        if path is None:
+            path = name
+            if not os.path.isabs(path):
+                path = os.path.join(self.asset_path, path)
+            path = os.path.normpath(path)
+            self._path_cache[name] = path
+        return path
 
     def _get_asset(self, name):
         path = self._asset_path(name)
@@ -183,15 +486,23 @@ class Presentation:
     def _get_size(self, asset):
         if isinstance(asset, str):
             asset = self._get_asset(asset)
-        info = asset.get_info()
-        video_info = info.get_video_streams()[0]
-        return (video_info.get_width(), video_info.get_height())
+        size = self._size_cache.get(asset.props.id)
+        if size is None:
+            info = asset.get_info()
+            video_info = info.get_video_streams()[0]
+            size = (video_info.get_width(), video_info.get_height())
+            self._size_cache[asset.props.id] = size
+        return size
 
     def _get_duration(self, asset):
         """ Return asset play duration """
         if isinstance(asset, str):
             asset = self._get_asset(asset)
-        return asset.props.duration
+        duration = self._duration_cache.get(asset.props.id)
+        if duration is None:
+            duration = asset.props.duration
+            self._duration_cache[asset.props.id] = duration
+        return duration
 
     def fit(self, asset, box, align="cc", shrink_only=False):
         """Fit and align an asset in a bounding box.
@@ -273,8 +584,13 @@ class Presentation:
         skip = self._cut[0]
         maxdt = self._cut[1] - skip
 
-        for png, start, duration in self._generate_slides(maxsize):
+        # Produce slides in a background thread so parsing and rasterization
+        # of the next slides overlap with the GES probes for the current one.
+        # The prefetch depth bounds how many render jobs can be in flight.
+        slides = _prefetch(self._generate_slides(maxsize), depth=64)
+        for png, start, duration in slides:
             # start and duration are already cut to the desired presentation time frame
+            self._await_render(png)
             size = self._get_size(png)
             box = self.fit(size, fit, align)
             start += self._opening_credits_length
@@ -291,12 +607,24 @@ class Presentation:
         fit into the configured timeframe."""
 
         start_ts, end_ts = self._cut
+        svg_image_q, xlink_href = SVG_IMAGE_Q, XLINK_HREF
+        canvas_q, shape_q = SVG_G_CANVAS_Q, SVG_G_SHAPE_Q
+        # Cached PNGs older than shapes.svg are stale (e.g. after a fresh
+        # download) and must be re-rendered.
+        self._shapes_mtime = os.path.getmtime(self._asset_path("shapes.svg"))
 
         doc = ET.parse(self._asset_path("shapes.svg"))
-        for img in doc.iterfind("./{http://www.w3.org/2000/svg}image"):
+
+        # Index the annotation canvases once; looking each one up with a
+        # per-slide XPath walk would rescan the whole document per slide.
+        canvas_by_image = {
+            canvas.get("image"): canvas for canvas in doc.iterfind(canvas_q)
+        }
+
+        for img in doc.iterfind(svg_image_q):
             logging.debug("Found slide: %s", img.get("id"))
 
-            path = img.get("{http://www.w3.org/1999/xlink}href")
+            path = img.get(xlink_href)
             img_start = to_ns(img.get("in"))
             img_end = to_ns(img.get("out"))
             img_width = int(img.get("width"))
@@ -315,61 +643,61 @@ class Presentation:
             img_start = max(img_start, start_ts)
             img_end = min(img_end, end_ts)
 
-            # Fix backgound image path
-            img.set("{http://www.w3.org/1999/xlink}href", self._asset_path(path))
+            # Fix backgound image path, then serialize the slide background
+            # once; every time slice reuses the same bytes.
+            img.set(xlink_href, self._asset_path(path))
+            img_bytes = ET.tostring(img)
+            viewbox = img_width, img_height
 
             # Find an SVG group with shapes belonging to this slide.
-            canvas = doc.find(
-                './{{http://www.w3.org/2000/svg}}g[@class="canvas"][@image="{}"]'.format(
-                    img.get("id")
-                )
-            )
+            canvas = canvas_by_image.get(img.get("id"))
 
             if canvas is None:
                 # No annotations, just a slide.
-                png = self._render_slide([img], size, f'{img.get("id")}-0.png')
+                png = self._render_slide([img_bytes], size, viewbox)
                 yield png, img_start, img_end - img_start
                 continue
 
-            # Collect shapes. Each shape can have multiple draw-steps with the same
-            # `shape` id and only the most recent version is visible.
-            shapes = {}  # id -> [(start, undo, shape), ...]
-            for shape in canvas.iterfind(
-                './{http://www.w3.org/2000/svg}g[@class="shape"]'
-            ):
-                shape_id = shape.get("shape")
+            # Collect draw-steps. Each shape can have multiple draw-steps with
+            # the same `shape` id and only the most recent version is visible.
+            steps = []  # [(shape_id, start, undo, shape), ...]
+            for shape in canvas.iterfind(shape_q):
                 shape_style = shape.get("style")
                 shape.set("style", shape_style.replace("visibility:hidden;", ""))
 
                 # Poll results are embedded as images. Make the href absolute.
-                for shape_img in shape.iterfind("./{http://www.w3.org/2000/svg}image"):
-                    href = shape_img.get("{http://www.w3.org/1999/xlink}href")
+                for shape_img in shape.iterfind(svg_image_q):
+                    href = shape_img.get(xlink_href)
                     href = self._asset_path(href)
-                    shape_img.set("{http://www.w3.org/1999/xlink}href", href)
+                    shape_img.set(xlink_href, href)
 
                 start = to_ns(shape.get("timestamp"))
                 undo = to_ns(shape.get("undo"))
-                shapes.setdefault(shape_id, []).append((start, undo, shape))
+                # Serialize once; the bytes are reused by every time slice
+                # the shape is visible in.
+                steps.append((shape.get("shape"), start, undo, ET.tostring(shape)))
+
+            # One lexicographic sort groups draw-steps by shape-id and orders
+            # them by start time within each shape.
+            steps.sort(key=lambda step: step[:2])
 
             # Build timeline of shapes and draw-steps during this slide
-            timeline = IntervalTree()
-            timeline.add(Interval(begin=img_start, end=img_end, data=[]))
-
-            # For each shape-id, order draw-steps by start-time and calculate end-time.
-            for shape_id, shapes in shapes.items():
-                shapes = sorted(shapes)  # sort by start time
-                zindex = shapes[0][
-                    0
+            intervals = [(img_start, img_end, [])]
+
+            for _, group in itertools.groupby(steps, key=lambda step: step[0]):
+                group = list(group)
+                zindex = group[0][
+                    1
                 ]  # Use start time for z-layer ordering (new on top)
 
-                for i, (start, undo, shape) in enumerate(shapes):
+                for i, (shape_id, start, undo, shape) in enumerate(group):
                     # When switching back to an old slides, shape start-time is way too small
                     start = max(img_start, start)
                     end = img_end
 
-                    if i + 1 < len(shapes):
+                    if i + 1 < len(group):
                         # Hide non-final draw-steps when replaced by the next draw-step.
-                        end = shapes[i + 1][0]
+                        end = group[i + 1][1]
                     elif undo > 0:
                         # Shape was erased, so hide it earlier
                         end = undo
@@ -377,46 +705,79 @@ class Presentation:
                     if end <= start:
                         continue  # May happen if self._cut removed parts of a slide livetime
                     if start >= img_end:
-                        loging.warning(
+                        logging.warning(
                             "Shape timing is off: start=%d end=%s",
                             start / Gst.SECOND,
                             end / Gst.SECOND,
                         )
                         continue  # Should not happen, but who knows
 
-                    timeline.add(Interval(begin=start, end=end, data=[(zindex, shape)]))
+                    intervals.append((start, end, [(zindex, shape)]))
 
-            # In multiuser-canvas mode, shape drawing may overlap in time. This
-            # split+merge step ensure that we have non-overlapping time slices, each
+            # In multiuser-canvas mode, shape drawing may overlap in time. The
+            # sweep in _build_slices yields non-overlapping time slices, each
             # containing all shapes that are visible in that slice.
-            timeline.split_overlaps()
-            timeline.merge_overlaps(data_reducer=lambda a, b: a + b)
-
             # Render one PNG per time slice
-            for i, interval in enumerate(sorted(timeline)):
-                shapes = [shape for zindex, shape in sorted(interval.data)]
-                png = self._render_slide(
-                    [img] + shapes, size, f'{img.get("id")}-{i}.png'
+            slices = _build_slices(img_start, img_end, intervals)
+            for begin, stop, data in slices:
+                shapes = [shape for zindex, shape in sorted(data)]
+                png = self._render_slide([img_bytes] + shapes, size, viewbox)
+                yield png, begin, stop - begin
+
+    def _render_slide(self, layers, size, viewbox):
+        """Submit a render job for the serialized `layers` and return the
+        target PNG path.
+
+        The path is content-addressed by the serialized SVG and target
+        size, so identical time slices (and reruns with a different
+        --size) never rasterize the same content twice. The PNG is only
+        guaranteed to exist after _await_render(path)."""
+        svg_bytes = self._slide_svg(layers, size, viewbox)
+        key = hashlib.blake2b(
+            svg_bytes + f"{size}".encode(), digest_size=12
+        ).hexdigest()
+
+        path = self._render_cache.get(key)
+        if path is None:
+            path = self._asset_path(f"render-{key}.png")
+            if not self._png_is_fresh(path):
+                if self._render_pool is None:
+                    self._render_pool = ProcessPoolExecutor(
+                        max_workers=os.cpu_count()
+                    )
+                self._render_futures[path] = self._render_pool.submit(
+                    _render_png_job, (svg_bytes, path, size)
                 )
-                yield png, interval.begin, interval.end - interval.begin
-
-    def _render_slide(self, layers, size, name):
-        path = self._asset_path(name)
-        if not os.path.exists(path):
-            svg = ET.XML('<svg version="1.1" xmlns="http://www.w3.org/2000/svg"></svg>')
-
-            # Scale to desired size but keep coordinates
-            bg = layers[0]  # Use first (bottom) layer as reference frame
-            bgw, bgh = int(bg.get("width")), int(bg.get("height"))
-            svg.set("viewBox", f"0 0 {bgw} {bgh}")
-            svg.set("width", str(size[0]))
-            svg.set("height", str(size[1]))
-
-            for layer in layers:
-                svg.append(layer)
-
-            cairosvg.svg2png(bytestring=ET.tostring(svg), write_to=path)
+            self._render_cache[key] = path
+        return path
 
+    def _png_is_fresh(self, path):
+        """ A cached PNG only counts if it is newer than shapes.svg """
+        try:
+            return os.path.getmtime(path) >= self._shapes_mtime
+        except OSError:
+            return False
+
+    def _slide_svg(self, layers, size, viewbox):
+        """Assemble pre-serialized SVG fragments into one SVG document.
+
+        Each fragment carries its own namespace declarations, so the
+        document is built by byte concatenation instead of re-serializing
+        an ElementTree per time slice. The viewBox keeps the original
+        slide coordinates while scaling to the desired size."""
+        bgw, bgh = viewbox
+        head = (
+            '<svg version="1.1" xmlns="http://www.w3.org/2000/svg" '
+            f'viewBox="0 0 {bgw} {bgh}" '
+            f'width="{size[0]}" height="{size[1]}">'
+        ).encode()
+        return head + b"".join(layers) + b"</svg>"
+
+    def _await_render(self, path):
+        """ Block until the render job for `path` (if any) has finished """
+        future = self._render_futures.pop(path, None)
+        if future is not None:
+            future.result()
         return path
 
     def add_deskshare(self, fit, align):
@@ -425,20 +786,21 @@ class Presentation:
             return
 
         doc = ET.parse(self._asset_path("deskshare.xml"))
-        events = doc.findall("./event")
+
+        # Convert all event timestamps in one pass up front.
+        # The width/height attributes are useless: the actual video is
+        # bigger, and runtime size changes are not reflected in the xml :/
+        events = [
+            (to_ns(event.get("start_timestamp")), to_ns(event.get("stop_timestamp")))
+            for event in doc.iterfind("./event")
+        ]
 
         duration = self._get_duration(video)
         tsoffset = self._opening_credits_length
         cut_start, cut_end = self._cut
         box = self.fit(video, fit, align)
 
-        for event in events:
-            share_start = to_ns(event.get("start_timestamp"))
-            share_end = to_ns(event.get("stop_timestamp"))
-            # These are useless? The actual video is bigger, and runtime size
-            #   changes are not reflected in the xml :/
-            # video_width = int(event.get('video_width'))
-            # video_height = int(event.get('video_height'))
+        for share_start, share_end in events:
             if share_start >= share_end or share_end > duration:
                 continue  # Bad data?
             if share_end <= cut_start or share_start >= cut_end:
@@ -499,6 +861,8 @@ class Presentation:
         self._closing_credits.append((skip, duration, fname))
 
     def save(self, target):
+        if hasattr(self.timeline, "thaw_commit"):
+            self.timeline.thaw_commit()
         self.timeline.commit_sync()
         self.timeline.save_to_uri(file_to_uri(target), None, True)
 
@@ -539,6 +903,15 @@ parser.add_argument(
     help="Width of the webcam area in pixel, or as a fraction.",
 )
 
+parser.add_argument(
+    "--codec",
+    metavar="CODEC",
+    type=str,
+    choices=("auto", "vp8", "vp9"),
+    default="auto",
+    help="Video codec for the encoding preset (vp9 needs GStreamer >= 1.20)",
+)
+
 parser.add_argument(
     "--backdrop",
     metavar="FILE",
@@ -583,7 +956,7 @@ def main(argv):
     source = opts.basedir
     width, height = tuple(map(int, opts.size.split("x", 2)))
 
-    p = Presentation(source=source, size=(width, height))
+    p = Presentation(source=source, size=(width, height), codec=opts.codec)
 
     if opts.start or opts.end:
         p.cut(opts.start, opts.end)